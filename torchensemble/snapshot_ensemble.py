@@ -10,7 +10,12 @@
 """
 
 
+import copy
 import math
+import inspect
+import functools
+import contextlib
+import itertools
 import torch
 import logging
 import warnings
@@ -22,7 +27,6 @@ from ._base import BaseModule, BaseClassifier, BaseRegressor
 from ._base import torchensemble_model_doc
 from .utils import io
 from .utils import set_module
-from .utils import operator as op
 from .utils.logging import get_tb_logger
 
 
@@ -34,6 +38,8 @@ __fit_doc = """
     ----------
     train_loader : torch.utils.data.DataLoader
         A :mod:`DataLoader` container that contains the training data.
+        When training on GPU, it should be created with ``pin_memory=True``
+        to overlap the host-to-device copy with the computation.
     lr_clip : list or tuple, default=None
         Specify the accepted range of learning rate. When the learning rate
         determined by the scheduler is out of this range, it will be clipped.
@@ -64,9 +70,201 @@ __fit_doc = """
         - If ``None``, the model will be saved in the current directory.
         - If not ``None``, the model will be saved in the specified
           directory: ``save_dir``.
+    use_amp : bool, default=True
+        Specify whether to train the base estimator with automatic mixed
+        precision and the channels last memory format on GPU. It has no
+        effect on CPU.
+    use_compile : bool, default=True
+        Specify whether to compile the base estimator with
+        :func:`torch.compile` when training on GPU. It has no effect on
+        CPU, or on platforms where :func:`torch.compile` is not supported.
+
+    Notes
+    -----
+    When ``cuda=True`` and ``use_amp=True``, the base estimator is trained
+    with automatic mixed precision, and 4D image batches are converted into
+    the channels last memory format. The validation runs in full precision
+    as :meth:`evaluate`. The base estimator is also compiled with
+    :func:`torch.compile` if it is supported and ``use_compile=True``.
+    Snapshots are kept in host memory, they are copied to GPU once in
+    :meth:`evaluate` and the validation, and one at a time in other forward
+    passes.
 """
 
 
+def _autocast(enabled):
+    """Return the autocast context on GPU for mixed precision training."""
+    if not enabled:
+        return _null_context()
+    if hasattr(torch, "autocast"):
+        return torch.autocast(device_type="cuda", enabled=enabled)
+    return torch.cuda.amp.autocast(enabled=enabled)
+
+
+def _inference_mode(mode=True):
+    """
+    Return the context that disables autograd in inference, or that leaves
+    the inference mode when ``mode`` is False.
+    """
+    if hasattr(torch, "inference_mode"):
+        return torch.inference_mode(mode)
+    return torch.no_grad() if mode else _null_context()
+
+
+@contextlib.contextmanager
+def _null_context():
+    """A context that does nothing."""
+    yield
+
+
+class _NullScaler(object):
+    """A gradient scaler that does nothing, used without mixed precision."""
+
+    def scale(self, loss):
+        return loss
+
+    def step(self, optimizer):
+        optimizer.step()
+
+    def update(self):
+        pass
+
+
+def _make_grad_scaler(enabled):
+    """Make the gradient scaler on GPU for mixed precision training."""
+    if not enabled:
+        return _NullScaler()
+    if hasattr(torch, "amp") and hasattr(torch.amp, "GradScaler"):
+        return torch.amp.GradScaler("cuda", enabled=enabled)
+    return torch.cuda.amp.GradScaler(enabled=enabled)
+
+
+def _make_zero_grad(optimizer):
+    """
+    Return the function that resets the gradients of the optimizer. The
+    gradients are set to ``None`` instead of zeros when it is supported in
+    PyTorch >= 1.7.
+    """
+    if "set_to_none" in inspect.signature(optimizer.zero_grad).parameters:
+        return functools.partial(optimizer.zero_grad, set_to_none=True)
+
+    return optimizer.zero_grad
+
+
+def _is_compile_supported():
+    """Check whether :func:`torch.compile` is supported on this platform."""
+    if not hasattr(torch, "compile"):
+        return False
+
+    try:
+        import torch._dynamo
+    except ImportError:
+        return False
+
+    is_supported = getattr(torch._dynamo, "is_dynamo_supported", None)
+    return is_supported is None or is_supported()
+
+
+def _compile(estimator, device, enabled=True):
+    """
+    Compile the estimator once for training on GPU, the returned function
+    shares the parameters with ``estimator``. It falls back to the eager
+    ``estimator`` if the compilation fails, while other errors in the
+    forward pass are raised as usual.
+    """
+    if not enabled or device.type != "cuda" or not _is_compile_supported():
+        return estimator
+
+    # Errors from Dynamo, and from the backend compiler wrapped by Dynamo
+    compile_error = torch._dynamo.exc.TorchDynamoException
+
+    compiled_estimator = torch.compile(
+        estimator, mode="reduce-overhead", dynamic=False
+    )
+    use_eager = False
+
+    # The compilation is lazy, errors are raised in the forward pass
+    def forward(*x):
+        nonlocal use_eager
+        if not use_eager:
+            try:
+                return compiled_estimator(*x)
+            except compile_error as e:
+                msg = (
+                    "Failed to compile the base estimator with the error:"
+                    " {}, fall back to the eager mode."
+                )
+                warnings.warn(msg.format(e), RuntimeWarning)
+                use_eager = True
+
+        return estimator(*x)
+
+    return forward
+
+
+# CUDA streams are cached here instead of on the ensemble, since they
+# cannot be pickled or deep-copied with the ensemble.
+_streams = {}
+
+
+def _get_stream(device, key):
+    """Return the CUDA stream on ``device`` cached under ``key``."""
+    if device.index is None:
+        device = torch.device(device.type, torch.cuda.current_device())
+
+    if (device, key) not in _streams:
+        _streams[(device, key)] = torch.cuda.Stream(device=device)
+
+    return _streams[(device, key)]
+
+
+def _is_on_device(module, device):
+    """Check whether the parameters and buffers of the module are on device."""
+    return all(
+        tensor.device.type == device.type
+        for tensor in itertools.chain(module.parameters(), module.buffers())
+    )
+
+
+def _copy_to_device(module, device):
+    """
+    Return a copy of the module with parameters and buffers on ``device``.
+    Tensors are copied to the device directly, without a temporary copy of
+    the module. Copies in host memory are pinned when CUDA is available,
+    from which they can be copied to GPU asynchronously.
+    """
+    memo = {}
+    for tensor in itertools.chain(module.parameters(), module.buffers()):
+        if device.type == "cpu":
+            new_tensor = torch.empty_strided(
+                tensor.size(),
+                tensor.stride(),
+                dtype=tensor.dtype,
+                pin_memory=torch.cuda.is_available(),
+            )
+            new_tensor.copy_(tensor.detach())
+        else:
+            new_tensor = tensor.detach().to(
+                device, non_blocking=True, copy=True
+            )
+        if isinstance(tensor, nn.Parameter):
+            new_tensor = nn.Parameter(new_tensor, tensor.requires_grad)
+        memo[id(tensor)] = new_tensor
+
+    # Tensors found in `memo` are reused, instead of being deep-copied
+    return copy.deepcopy(module, memo)
+
+
+def _to_channels_last(data):
+    """Convert 4D image batches in ``data`` into the channels last format."""
+    return [
+        tensor.to(memory_format=torch.channels_last)
+        if tensor.dim() == 4
+        else tensor
+        for tensor in data
+    ]
+
+
 def _snapshot_ensemble_model_doc(header, item="fit"):
     """
     Decorator on obtaining documentation for different snapshot ensemble
@@ -109,12 +307,22 @@ class _BaseSnapshotEnsemble(BaseModule):
         self.tb_logger = get_tb_logger()
 
         self.estimators_ = nn.ModuleList()
+        # A copy of the base estimator on device for snapshots in host
+        # memory. It is kept in a list to stay out of the state dict.
+        self._device_estimator = []
+        self._tb_buffer = []
+        self._use_vmap = True
+        # Snapshots stacked for the vmap path, and copies of snapshots on
+        # device, both cached within `_snapshot_cache`.
+        self._stacked_state = None
+        self._device_snapshots = None
+        self._cache_snapshots = False
 
     def _validate_parameters(self, lr_clip, epochs, log_interval):
         """Validate hyper-parameters on training the ensemble."""
 
         if lr_clip:
-            if not (isinstance(lr_clip, list) or isinstance(lr_clip, tuple)):
+            if not isinstance(lr_clip, (list, tuple)):
                 msg = "lr_clip should be a list or tuple with two elements."
                 self.logger.error(msg)
                 raise ValueError(msg)
@@ -160,28 +368,303 @@ class _BaseSnapshotEnsemble(BaseModule):
             self.logger.error(msg.format(epochs, self.n_estimators))
             raise ValueError(msg.format(epochs, self.n_estimators))
 
+    def _check_dataloader(self, train_loader):
+        """Check whether the training dataloader uses pinned memory."""
+        if self.device.type == "cuda" and not getattr(
+            train_loader, "pin_memory", False
+        ):
+            msg = (
+                "The training dataloader does not use pinned memory, set"
+                " `pin_memory=True` to enable asynchronous copy of data"
+                " batches to GPU."
+            )
+            warnings.warn(msg, RuntimeWarning)
+
+    def _run_validation(self, validate, *args):
+        """
+        Run ``validate`` on a separate CUDA stream, so that the training on
+        the current stream goes on without waiting for its results. Return
+        the results of ``validate``, and the event recorded after it that
+        should be synchronized before reading the results. On CPU,
+        ``validate`` runs synchronously and the returned event is ``None``.
+        """
+        if self.device.type != "cuda":
+            return validate(*args), None
+
+        val_stream = _get_stream(self.device, "validation")
+
+        # The validation should start after the snapshot has been copied
+        val_stream.wait_stream(torch.cuda.current_stream(self.device))
+        with torch.cuda.stream(val_stream):
+            results = validate(*args)
+            event = torch.cuda.Event()
+            event.record(val_stream)
+
+        return results, event
+
+    def _add_scalar(self, tag, value, global_step, buffer_size=50):
+        """
+        Buffer a scalar for the TensorBoard logger. Buffered scalars are
+        written in one block when the buffer is full.
+        """
+        self._tb_buffer.append((tag, value, global_step))
+        if len(self._tb_buffer) >= buffer_size:
+            self._flush_scalars()
+
+    def _flush_scalars(self):
+        """Write all buffered scalars to the TensorBoard logger."""
+        for tag, value, global_step in self._tb_buffer:
+            self.tb_logger.add_scalar(tag, value, global_step)
+        self._tb_buffer = []
+
     def _forward(self, *x):
         """
         Implementation on the internal data forwarding in snapshot ensemble.
         """
-        # Average
-        results = [estimator(*x) for estimator in self.estimators_]
-        output = op.average(results)
+        outputs = self._estimator_outputs(*x)
+        if isinstance(outputs, torch.Tensor):
+            return outputs.mean(dim=0)
+
+        # Average with a running sum, instead of collecting the outputs from
+        # all snapshots into a list first.
+        output = next(outputs)
+        for estimator_output in outputs:
+            output = output + estimator_output
+        output = output / len(self.estimators_)
 
         return output
 
-    def _clip_lr(self, optimizer, lr_clip):
-        """Clip the learning rate of the optimizer according to `lr_clip`."""
+    def _estimator_outputs(self, *x):
+        """
+        Return the outputs of all snapshots on the data batch ``x``, either
+        as one tensor stacked along the first dimension when all snapshots
+        are evaluated together with :func:`torch.func.vmap`, or as an
+        iterator over the output of each snapshot.
+        """
+        outputs = self._vmap_forward(*x)
+        if outputs is not None:
+            return outputs
+
+        estimators = self._get_device_snapshots()
+        if estimators is None:
+            return self._host_outputs(*x)
+
+        if self.device.type == "cuda" and len(estimators) > 1:
+            return self._stream_outputs(estimators, *x)
+
+        return (estimator(*x) for estimator in estimators)
+
+    def _vmap_forward(self, *x):
+        """
+        Evaluate all snapshots in one batched call with
+        :func:`torch.func.vmap`, which stacks the parameters of snapshots
+        that share the same architecture. Return ``None`` if it is not
+        applicable.
+        """
+        # The stacked parameters are detached from the snapshots, this path
+        # is therefore only used in inference.
+        if (
+            not self._use_vmap
+            or not hasattr(torch, "func")
+            or self.training
+            or torch.is_grad_enabled()
+            or len(self.estimators_) < 2
+        ):
+            return None
+
+        template, params, buffers = self._get_stacked_state()
+
+        def fmodel(params, buffers, *x):
+            return torch.func.functional_call(template, (params, buffers), x)
+
+        in_dims = (0, 0) + (None,) * len(x)
+        try:
+            outputs = torch.func.vmap(fmodel, in_dims=in_dims)(
+                params, buffers, *x
+            )
+        except RuntimeError:
+            outputs = None
+
+        if not isinstance(outputs, torch.Tensor):
+            msg = (
+                "Failed to evaluate all snapshots in one batched call, fall"
+                " back to evaluating them one by one."
+            )
+            warnings.warn(msg, RuntimeWarning)
+            self._use_vmap = False
+            return None
+
+        return outputs
+
+    def _host_outputs(self, *x):
+        """
+        Yield the outputs of all snapshots on the data batch ``x``, where
+        snapshots in host memory are copied one at a time into a reused
+        estimator on device. Each output should be consumed before the next
+        one is yielded.
+        """
+        if not self._device_estimator:
+            # Built outside the inference mode, otherwise its parameters are
+            # inference tensors that cannot be updated under `no_grad`.
+            with _inference_mode(False):
+                device_estimator = copy.deepcopy(self.estimators_[0])
+                device_estimator = device_estimator.to(self.device)
+            self._device_estimator.append(device_estimator)
+        device_estimator = self._device_estimator[0]
+
+        device_tensors = list(
+            itertools.chain(
+                device_estimator.parameters(), device_estimator.buffers()
+            )
+        )
+        for estimator in self.estimators_:
+            if _is_on_device(estimator, self.device):
+                yield estimator(*x)
+                continue
+
+            host_tensors = itertools.chain(
+                estimator.parameters(), estimator.buffers()
+            )
+            with torch.no_grad():
+                for device_tensor, host_tensor in zip(
+                    device_tensors, host_tensors
+                ):
+                    device_tensor.copy_(host_tensor, non_blocking=True)
+            device_estimator.train(estimator.training)
+            yield device_estimator(*x)
+
+    @contextlib.contextmanager
+    def _snapshot_cache(self):
+        """
+        Cache the snapshots on device across forward passes within the
+        context, e.g., over batches in the evaluation. Snapshots in host
+        memory are therefore copied to device only once. The cache is a full
+        copy of all snapshots, and it is released on exit.
+        """
+        cache_snapshots = self._cache_snapshots
+        self._cache_snapshots = True
+        try:
+            yield
+        finally:
+            self._cache_snapshots = cache_snapshots
+            if not cache_snapshots:
+                self._stacked_state = None
+                self._device_snapshots = None
+
+    def _snapshot_key(self):
+        """
+        Return the key that changes when any snapshot changes, used to check
+        whether the cached snapshots are outdated.
+        """
+        return [
+            (id(tensor), tensor._version)
+            for estimator in self.estimators_
+            for tensor in itertools.chain(
+                estimator.parameters(), estimator.buffers()
+            )
+        ]
+
+    def _get_stacked_state(self):
+        """
+        Return the parameters and buffers of all snapshots stacked along the
+        first dimension on device, together with a stateless template of
+        the base estimator. Within :meth:`_snapshot_cache`, the result is
+        cached until any snapshot changes.
+        """
+        key = self._snapshot_key()
+        if self._stacked_state is not None and self._stacked_state[0] == key:
+            return self._stacked_state[1:]
+
+        params, buffers = torch.func.stack_module_state(list(self.estimators_))
+        # Snapshots in host memory are stacked before the copy to device
+        params = {
+            name: param.to(self.device, non_blocking=True)
+            for name, param in params.items()
+        }
+        buffers = {
+            name: buffer.to(self.device, non_blocking=True)
+            for name, buffer in buffers.items()
+        }
+        template = copy.deepcopy(self.estimators_[0]).to("meta")
+        if self._cache_snapshots:
+            self._stacked_state = (key, template, params, buffers)
+
+        return template, params, buffers
+
+    def _get_device_snapshots(self):
+        """
+        Return the list of snapshots on device. Snapshots in host memory are
+        copied to device within :meth:`_snapshot_cache`, and ``None`` is
+        returned outside it.
+        """
+        if all(
+            _is_on_device(estimator, self.device)
+            for estimator in self.estimators_
+        ):
+            return list(self.estimators_)
+
+        if not self._cache_snapshots:
+            return None
+
+        key = self._snapshot_key()
+        if self._device_snapshots is None or self._device_snapshots[0] != key:
+            estimators = [
+                _copy_to_device(estimator, self.device)
+                for estimator in self.estimators_
+            ]
+            self._device_snapshots = (key, estimators)
+
+        return self._device_snapshots[1]
+
+    def _stream_outputs(self, estimators, *x):
+        """
+        Yield the outputs of ``estimators`` on the data batch ``x``, where
+        each snapshot is launched on its own CUDA stream so that kernels from
+        different snapshots can overlap.
+        """
+        # Streams are created once and reused across forward passes
+        streams = [
+            _get_stream(self.device, index) for index in range(len(estimators))
+        ]
+        current_stream = torch.cuda.current_stream(self.device)
+        outputs = []
+        for estimator, stream in zip(estimators, streams):
+            stream.wait_stream(current_stream)
+            for data in x:
+                data.record_stream(stream)
+            with torch.cuda.stream(stream):
+                outputs.append(estimator(*x))
+
+        # Pop each output from the list before yielding it, so that its
+        # memory can be released once consumed by the caller.
+        for stream in streams:
+            output = outputs.pop(0)
+            current_stream.wait_stream(stream)
+            output.record_stream(current_stream)
+            yield output
+
+    def _set_lr_clipper(self, optimizer, lr_clip):
+        """
+        Return the function that clips the learning rate of the optimizer
+        according to `lr_clip`. The check on `lr_clip` is conducted only
+        once here, instead of per iteration.
+        """
         if not lr_clip:
-            return optimizer
+            return lambda: None
 
-        for param_group in optimizer.param_groups:
-            if param_group["lr"] < lr_clip[0]:
-                param_group["lr"] = lr_clip[0]
-            if param_group["lr"] > lr_clip[1]:
-                param_group["lr"] = lr_clip[1]
+        lr_min, lr_max = lr_clip
 
-        return optimizer
+        # The optimizer on the base estimator only has one param group
+        param_group = optimizer.param_groups[0]
+
+        def clip_lr():
+            lr = param_group["lr"]
+            if lr < lr_min:
+                param_group["lr"] = lr_min
+            elif lr > lr_max:
+                param_group["lr"] = lr_max
+
+        return clip_lr
 
     def _set_scheduler(self, optimizer, n_iters):
         """
@@ -189,9 +672,14 @@ class _BaseSnapshotEnsemble(BaseModule):
         Please refer to the equation (2) in original paper for details.
         """
         T_M = math.ceil(n_iters / self.n_estimators)
-        lr_lambda = lambda iteration: 0.5 * (  # noqa: E731
-            torch.cos(torch.tensor(math.pi * (iteration % T_M) / T_M)) + 1
-        )
+
+        # The multiplicative factor only takes `T_M` distinct values, which
+        # are computed once in advance.
+        lr_factors = [
+            0.5 * (math.cos(math.pi * iteration / T_M) + 1)
+            for iteration in range(T_M)
+        ]
+        lr_lambda = lambda iteration: lr_factors[iteration % T_M]  # noqa: E731
         scheduler = LambdaLR(optimizer, lr_lambda=lr_lambda)
 
         return scheduler
@@ -219,19 +707,67 @@ class SnapshotEnsembleClassifier(_BaseSnapshotEnsemble, BaseClassifier):
         "classifier_forward",
     )
     def forward(self, *x):
-
-        outputs = [
-            F.softmax(estimator(*x), dim=1) for estimator in self.estimators_
-        ]
+        outputs = self._estimator_outputs(*x)
 
         if self.voting_strategy == "soft":
-            proba = op.average(outputs)
+            proba = self._soft_vote(outputs)
 
         elif self.voting_strategy == "hard":
-            proba = op.majority_vote(outputs)
+            labels = self._hard_vote(outputs)
+            proba = torch.zeros(
+                labels.size(0), self.n_outputs, device=labels.device
+            )
+            proba.scatter_(1, labels.view(-1, 1), 1)
+
+        return proba
+
+    def _soft_vote(self, outputs):
+        """Average over class distributions from all snapshots."""
+        # Outputs from all snapshots are stacked into one tensor of shape
+        # (n_estimators, n_samples, n_classes).
+        if isinstance(outputs, torch.Tensor):
+            return F.softmax(outputs, dim=2).mean(dim=0)
+
+        proba = F.softmax(next(outputs), dim=1)
+        for output in outputs:
+            proba = proba + F.softmax(output, dim=1)
+        proba = proba / len(self.estimators_)
 
         return proba
 
+    def _hard_vote(self, outputs):
+        """
+        Return the majority vote on the labels predicted by all snapshots.
+        The softmax is skipped since it does not change the predicted labels.
+        """
+        # Count the votes in a tensor of shape (n_samples, n_classes), which
+        # is updated by each snapshot in place. Ties go to the smaller label.
+        if isinstance(outputs, torch.Tensor):
+            labels = outputs.argmax(dim=2).t()
+            votes = torch.zeros_like(outputs[0], dtype=torch.long)
+            votes.scatter_add_(1, labels, torch.ones_like(labels))
+        else:
+            votes = None
+            for output in outputs:
+                labels = output.argmax(dim=1, keepdim=True)
+                if votes is None:
+                    votes = torch.zeros_like(output, dtype=torch.long)
+                votes.scatter_add_(1, labels, torch.ones_like(labels))
+
+        return votes.argmax(dim=1)
+
+    def _predict_labels(self, *x):
+        """
+        Return the labels predicted by the ensemble, without building the
+        class distributions in :meth:`forward`.
+        """
+        outputs = self._estimator_outputs(*x)
+
+        if self.voting_strategy == "soft":
+            return self._soft_vote(outputs).argmax(dim=1)
+
+        return self._hard_vote(outputs)
+
     @torchensemble_model_doc(
         """Set the attributes on optimizer for SnapshotEnsembleClassifier.""",
         "set_optimizer",
@@ -259,130 +795,216 @@ class SnapshotEnsembleClassifier(_BaseSnapshotEnsemble, BaseClassifier):
         test_loader=None,
         save_model=True,
         save_dir=None,
+        use_amp=True,
+        use_compile=True,
     ):
         self._validate_parameters(lr_clip, epochs, log_interval)
+        self._check_dataloader(train_loader)
         self.n_outputs = self._decide_n_outputs(train_loader)
 
+        # Mixed precision and channels last are only enabled on GPU
+        use_amp = use_amp and self.device.type == "cuda"
+
         estimator = self._make_estimator()
+        if use_amp:
+            estimator = estimator.to(memory_format=torch.channels_last)
+        train_estimator = _compile(estimator, self.device, use_compile)
 
         # Set the optimizer and scheduler
         optimizer = set_module.set_optimizer(
             estimator, self.optimizer_name, **self.optimizer_args
         )
 
-        scheduler = self._set_scheduler(optimizer, epochs * len(train_loader))
+        n_batches = len(train_loader)
+        scheduler = self._set_scheduler(optimizer, epochs * n_batches)
+        scaler = _make_grad_scaler(use_amp)
+        clip_lr = self._set_lr_clipper(optimizer, lr_clip)
+        zero_grad = _make_zero_grad(optimizer)
 
         # Check the training criterion
         if not hasattr(self, "_criterion"):
             self._criterion = nn.CrossEntropyLoss()
 
+        # Attributes used per iteration are bound to local variables
+        device = self.device
+        criterion = self._criterion
+        logger = self.logger
+        tb_logger = self.tb_logger
+
         # Utils
         best_acc = 0.0
         counter = 0  # a counter on generating snapshots
+        save_future = None  # the pending model serialization
         total_iters = 0
-        n_iters_per_estimator = epochs * len(train_loader) // self.n_estimators
-
-        # Training loop
-        estimator.train()
-        for epoch in range(epochs):
-            for batch_idx, elem in enumerate(train_loader):
-
-                data, target = io.split_data_target(elem, self.device)
-                batch_size = data[0].size(0)
-
-                # Clip the learning rate
-                optimizer = self._clip_lr(optimizer, lr_clip)
-
-                optimizer.zero_grad()
-                output = estimator(*data)
-                loss = self._criterion(output, target)
-                loss.backward()
-                optimizer.step()
-
-                # Print training status
-                if batch_idx % log_interval == 0:
-                    with torch.no_grad():
-                        _, predicted = torch.max(output.data, 1)
-                        correct = (predicted == target).sum().item()
-
-                        msg = (
-                            "lr: {:.5f} | Epoch: {:03d} | Batch: {:03d} |"
-                            " Loss: {:.5f} | Correct: {:d}/{:d}"
-                        )
-                        self.logger.info(
-                            msg.format(
-                                optimizer.param_groups[0]["lr"],
-                                epoch,
-                                batch_idx,
-                                loss,
-                                correct,
-                                batch_size,
-                            )
-                        )
-                        if self.tb_logger:
-                            self.tb_logger.add_scalar(
-                                "snapshot_ensemble/Train_Loss",
-                                loss,
-                                total_iters,
-                            )
-                        else:
-                            print("None")
-
-                # Snapshot ensemble updates the learning rate per iteration
-                # instead of per epoch.
-                scheduler.step()
-                counter += 1
-                total_iters += 1
+        n_iters_per_estimator = epochs * n_batches // self.n_estimators
+        next_snapshot = n_iters_per_estimator  # when to generate a snapshot
+
+        # The validation on the last snapshot, which runs in background on
+        # GPU while the training goes on.
+        pending_validation = None
+
+        def report_validation(results, event):
+            nonlocal best_acc, save_future
+            if event is not None:
+                event.synchronize()
+
+            correct, total = results
+            acc = 100 * correct.item() / total
+
+            if acc > best_acc:
+                best_acc = acc
+                if save_model:
+                    # Errors from the last serialization are raised here
+                    if save_future is not None:
+                        save_future.result()
+                    save_future = io.save(
+                        self, save_dir, logger, blocking=False
+                    )
 
-            if counter % n_iters_per_estimator == 0:
+            msg = (
+                "n_estimators: {} | Validation Acc: {:.3f} %"
+                " | Historical Best: {:.3f} %"
+            )
+            logger.info(msg.format(len(self.estimators_), acc, best_acc))
+            if tb_logger:
+                self._add_scalar(
+                    "snapshot_ensemble/Validation_Acc",
+                    acc,
+                    len(self.estimators_),
+                )
 
-                # Generate and save the snapshot
-                snapshot = self._make_estimator()
-                snapshot.load_state_dict(estimator.state_dict())
+        # Training loop, buffered scalars are flushed even if the training
+        # is interrupted.
+        try:
+            estimator.train()
+            for epoch in range(epochs):
+                for batch_idx, elem in enumerate(train_loader):
+
+                    data, target = io.split_data_target(elem, device)
+                    if use_amp:
+                        data = _to_channels_last(data)
+                    batch_size = data[0].size(0)
+
+                    # Clip the learning rate
+                    clip_lr()
+
+                    zero_grad()
+                    with _autocast(use_amp):
+                        output = train_estimator(*data)
+                        loss = criterion(output, target)
+                    scaler.scale(loss).backward()
+                    scaler.step(optimizer)
+                    scaler.update()
+
+                    # Print training status
+                    if batch_idx % log_interval == 0:
+                        with _inference_mode():
+                            correct = (output.argmax(dim=1) == target).sum()
+
+                            # Fetch the loss and the number of correct
+                            # predictions with one device-to-host copy.
+                            loss_value, correct = torch.stack(
+                                [loss.detach().float(), correct.float()]
+                            ).tolist()
+
+                            msg = (
+                                "lr: {:.5f} | Epoch: {:03d} | Batch: {:03d} |"
+                                " Loss: {:.5f} | Correct: {:d}/{:d}"
+                            )
+                            logger.info(
+                                msg.format(
+                                    optimizer.param_groups[0]["lr"],
+                                    epoch,
+                                    batch_idx,
+                                    loss_value,
+                                    int(correct),
+                                    batch_size,
+                                )
+                            )
+                            if tb_logger:
+                                self._add_scalar(
+                                    "snapshot_ensemble/Train_Loss",
+                                    loss_value,
+                                    total_iters,
+                                )
+
+                    # Snapshot ensemble updates the learning rate per iteration
+                    # instead of per epoch.
+                    scheduler.step()
+                    counter += 1
+                    total_iters += 1
+
+                if counter < next_snapshot:
+                    continue
+                next_snapshot += n_iters_per_estimator
+
+                # Report the validation on the last snapshot before the
+                # ensemble changes, since the ensemble may be saved.
+                if pending_validation is not None:
+                    report_validation(*pending_validation)
+                    pending_validation = None
+
+                # Generate and save the snapshot. The estimator is copied
+                # directly, which skips the parameter initialization in
+                # making a new base estimator. On GPU, snapshots are kept in
+                # host memory to save the GPU memory.
+                if device.type == "cuda":
+                    snapshot = _copy_to_device(estimator, torch.device("cpu"))
+                else:
+                    snapshot = copy.deepcopy(estimator)
                 self.estimators_.append(snapshot)
 
                 msg = "Save the snapshot model with index: {}"
-                self.logger.info(msg.format(len(self.estimators_) - 1))
-
-            # Validation after each snapshot model being generated
-            if test_loader and counter % n_iters_per_estimator == 0:
-                self.eval()
-                with torch.no_grad():
-                    correct = 0
-                    total = 0
-                    for _, elem in enumerate(test_loader):
-                        data, target = io.split_data_target(elem, self.device)
-                        output = self.forward(*data)
-                        _, predicted = torch.max(output.data, 1)
-                        correct += (predicted == target).sum().item()
-                        total += target.size(0)
-                    acc = 100 * correct / total
-
-                    if acc > best_acc:
-                        best_acc = acc
-                        if save_model:
-                            io.save(self, save_dir, self.logger)
-
-                    msg = (
-                        "n_estimators: {} | Validation Acc: {:.3f} %"
-                        " | Historical Best: {:.3f} %"
-                    )
-                    self.logger.info(
-                        msg.format(len(self.estimators_), acc, best_acc)
+                logger.info(msg.format(len(self.estimators_) - 1))
+
+                # Validation after each snapshot model being generated
+                if test_loader:
+                    pending_validation = self._run_validation(
+                        self._validate, test_loader, use_amp
                     )
-                    if self.tb_logger:
-                        self.tb_logger.add_scalar(
-                            "snapshot_ensemble/Validation_Acc",
-                            acc,
-                            len(self.estimators_),
-                        )
+                    # Report right away if the validation runs synchronously
+                    if pending_validation[1] is None:
+                        report_validation(*pending_validation)
+                        pending_validation = None
+
+            if pending_validation is not None:
+                report_validation(*pending_validation)
+        finally:
+            self._flush_scalars()
+
+            # Wait for the model serialization in background to finish
+            if save_future is not None:
+                save_future.result()
 
         if save_model and not test_loader:
-            io.save(self, save_dir, self.logger)
+            io.save(self, save_dir, logger)
+
+    def _validate(self, test_loader, channels_last):
+        """
+        Return the number of correct predictions on ``test_loader``, which
+        is accumulated on device, and the number of samples. The validation
+        runs in full precision as :meth:`evaluate`.
+        """
+        device = self.device
+        self.eval()
+        with _inference_mode(), self._snapshot_cache():
+            correct = torch.zeros((), dtype=torch.long, device=device)
+            total = 0
+            for _, elem in enumerate(test_loader):
+                data, target = io.split_data_target(elem, device)
+                if channels_last:
+                    data = _to_channels_last(data)
+                predicted = self._predict_labels(*data)
+                correct.add_((predicted == target).sum())
+                total += target.size(0)
+
+        return correct, total
 
     @torchensemble_model_doc(item="classifier_evaluate")
+    @_inference_mode()
     def evaluate(self, test_loader, return_loss=False):
-        return super().evaluate(test_loader, return_loss)
+        with self._snapshot_cache():
+            return super().evaluate(test_loader, return_loss)
 
     @torchensemble_model_doc(item="predict")
     def predict(self, *x):
@@ -428,118 +1050,206 @@ class SnapshotEnsembleRegressor(_BaseSnapshotEnsemble, BaseRegressor):
         test_loader=None,
         save_model=True,
         save_dir=None,
+        use_amp=True,
+        use_compile=True,
     ):
         self._validate_parameters(lr_clip, epochs, log_interval)
+        self._check_dataloader(train_loader)
         self.n_outputs = self._decide_n_outputs(train_loader)
 
+        # Mixed precision and channels last are only enabled on GPU
+        use_amp = use_amp and self.device.type == "cuda"
+
         estimator = self._make_estimator()
+        if use_amp:
+            estimator = estimator.to(memory_format=torch.channels_last)
+        train_estimator = _compile(estimator, self.device, use_compile)
 
         # Set the optimizer and scheduler
         optimizer = set_module.set_optimizer(
             estimator, self.optimizer_name, **self.optimizer_args
         )
 
-        scheduler = self._set_scheduler(optimizer, epochs * len(train_loader))
+        n_batches = len(train_loader)
+        scheduler = self._set_scheduler(optimizer, epochs * n_batches)
+        scaler = _make_grad_scaler(use_amp)
+        clip_lr = self._set_lr_clipper(optimizer, lr_clip)
+        zero_grad = _make_zero_grad(optimizer)
 
         # Check the training criterion
         if not hasattr(self, "_criterion"):
             self._criterion = nn.MSELoss()
 
+        # Attributes used per iteration are bound to local variables
+        device = self.device
+        criterion = self._criterion
+        logger = self.logger
+        tb_logger = self.tb_logger
+
         # Utils
         best_loss = float("inf")
         counter = 0  # a counter on generating snapshots
+        save_future = None  # the pending model serialization
         total_iters = 0
-        n_iters_per_estimator = epochs * len(train_loader) // self.n_estimators
-
-        # Training loop
-        estimator.train()
-        for epoch in range(epochs):
-            for batch_idx, elem in enumerate(train_loader):
-
-                data, target = io.split_data_target(elem, self.device)
-
-                # Clip the learning rate
-                optimizer = self._clip_lr(optimizer, lr_clip)
-
-                optimizer.zero_grad()
-                output = estimator(*data)
-                loss = self._criterion(output, target)
-                loss.backward()
-                optimizer.step()
-
-                # Print training status
-                if batch_idx % log_interval == 0:
-                    with torch.no_grad():
-                        msg = (
-                            "lr: {:.5f} | Epoch: {:03d} | Batch: {:03d}"
-                            " | Loss: {:.5f}"
-                        )
-                        self.logger.info(
-                            msg.format(
-                                optimizer.param_groups[0]["lr"],
-                                epoch,
-                                batch_idx,
-                                loss,
-                            )
-                        )
-                        if self.tb_logger:
-                            self.tb_logger.add_scalar(
-                                "snapshot_ensemble/Train_Loss",
-                                loss,
-                                total_iters,
-                            )
+        n_iters_per_estimator = epochs * n_batches // self.n_estimators
+        next_snapshot = n_iters_per_estimator  # when to generate a snapshot
+
+        # The validation on the last snapshot, which runs in background on
+        # GPU while the training goes on.
+        pending_validation = None
+
+        def report_validation(results, event):
+            nonlocal best_loss, save_future
+            if event is not None:
+                event.synchronize()
+
+            val_loss, n_val_batches = results
+            val_loss = val_loss.item() / n_val_batches
+
+            if val_loss < best_loss:
+                best_loss = val_loss
+                if save_model:
+                    # Errors from the last serialization are raised here
+                    if save_future is not None:
+                        save_future.result()
+                    save_future = io.save(
+                        self, save_dir, logger, blocking=False
+                    )
 
-                # Snapshot ensemble updates the learning rate per iteration
-                # instead of per epoch.
-                scheduler.step()
-                counter += 1
-                total_iters += 1
+            msg = (
+                "n_estimators: {} | Validation Loss: {:.5f} |"
+                " Historical Best: {:.5f}"
+            )
+            logger.info(msg.format(len(self.estimators_), val_loss, best_loss))
+            if tb_logger:
+                self._add_scalar(
+                    "snapshot_ensemble/Validation_Loss",
+                    val_loss,
+                    len(self.estimators_),
+                )
 
-            if counter % n_iters_per_estimator == 0:
-                # Generate and save the snapshot
-                snapshot = self._make_estimator()
-                snapshot.load_state_dict(estimator.state_dict())
+        # Training loop, buffered scalars are flushed even if the training
+        # is interrupted.
+        try:
+            estimator.train()
+            for epoch in range(epochs):
+                for batch_idx, elem in enumerate(train_loader):
+
+                    data, target = io.split_data_target(elem, device)
+                    if use_amp:
+                        data = _to_channels_last(data)
+
+                    # Clip the learning rate
+                    clip_lr()
+
+                    zero_grad()
+                    with _autocast(use_amp):
+                        output = train_estimator(*data)
+                        loss = criterion(output, target)
+                    scaler.scale(loss).backward()
+                    scaler.step(optimizer)
+                    scaler.update()
+
+                    # Print training status
+                    if batch_idx % log_interval == 0:
+                        with _inference_mode():
+                            loss_value = loss.item()
+
+                            msg = (
+                                "lr: {:.5f} | Epoch: {:03d} | Batch: {:03d}"
+                                " | Loss: {:.5f}"
+                            )
+                            logger.info(
+                                msg.format(
+                                    optimizer.param_groups[0]["lr"],
+                                    epoch,
+                                    batch_idx,
+                                    loss_value,
+                                )
+                            )
+                            if tb_logger:
+                                self._add_scalar(
+                                    "snapshot_ensemble/Train_Loss",
+                                    loss_value,
+                                    total_iters,
+                                )
+
+                    # Snapshot ensemble updates the learning rate per iteration
+                    # instead of per epoch.
+                    scheduler.step()
+                    counter += 1
+                    total_iters += 1
+
+                if counter < next_snapshot:
+                    continue
+                next_snapshot += n_iters_per_estimator
+
+                # Report the validation on the last snapshot before the
+                # ensemble changes, since the ensemble may be saved.
+                if pending_validation is not None:
+                    report_validation(*pending_validation)
+                    pending_validation = None
+
+                # Generate and save the snapshot. The estimator is copied
+                # directly, which skips the parameter initialization in
+                # making a new base estimator. On GPU, snapshots are kept in
+                # host memory to save the GPU memory.
+                if device.type == "cuda":
+                    snapshot = _copy_to_device(estimator, torch.device("cpu"))
+                else:
+                    snapshot = copy.deepcopy(estimator)
                 self.estimators_.append(snapshot)
 
                 msg = "Save the snapshot model with index: {}"
-                self.logger.info(msg.format(len(self.estimators_) - 1))
-
-            # Validation after each snapshot model being generated
-            if test_loader and counter % n_iters_per_estimator == 0:
-                self.eval()
-                with torch.no_grad():
-                    val_loss = 0.0
-                    for _, elem in enumerate(test_loader):
-                        data, target = io.split_data_target(elem, self.device)
-                        output = self.forward(*data)
-                        val_loss += self._criterion(output, target)
-                    val_loss /= len(test_loader)
-
-                    if val_loss < best_loss:
-                        best_loss = val_loss
-                        if save_model:
-                            io.save(self, save_dir, self.logger)
-
-                    msg = (
-                        "n_estimators: {} | Validation Loss: {:.5f} |"
-                        " Historical Best: {:.5f}"
-                    )
-                    self.logger.info(
-                        msg.format(len(self.estimators_), val_loss, best_loss)
+                logger.info(msg.format(len(self.estimators_) - 1))
+
+                # Validation after each snapshot model being generated
+                if test_loader:
+                    pending_validation = self._run_validation(
+                        self._validate, test_loader, use_amp
                     )
-                    if self.tb_logger:
-                        self.tb_logger.add_scalar(
-                            "snapshot_ensemble/Validation_Loss",
-                            val_loss,
-                            len(self.estimators_),
-                        )
+                    # Report right away if the validation runs synchronously
+                    if pending_validation[1] is None:
+                        report_validation(*pending_validation)
+                        pending_validation = None
+
+            if pending_validation is not None:
+                report_validation(*pending_validation)
+        finally:
+            self._flush_scalars()
+
+            # Wait for the model serialization in background to finish
+            if save_future is not None:
+                save_future.result()
 
         if save_model and not test_loader:
-            io.save(self, save_dir, self.logger)
+            io.save(self, save_dir, logger)
+
+    def _validate(self, test_loader, channels_last):
+        """
+        Return the summed loss on ``test_loader``, which is accumulated on
+        device, and the number of batches. The validation runs in full
+        precision as :meth:`evaluate`.
+        """
+        device = self.device
+        criterion = self._criterion
+        self.eval()
+        with _inference_mode(), self._snapshot_cache():
+            val_loss = torch.zeros((), device=device)
+            for _, elem in enumerate(test_loader):
+                data, target = io.split_data_target(elem, device)
+                if channels_last:
+                    data = _to_channels_last(data)
+                output = self.forward(*data)
+                val_loss.add_(criterion(output, target))
+
+        return val_loss, len(test_loader)
 
     @torchensemble_model_doc(item="regressor_evaluate")
+    @_inference_mode()
     def evaluate(self, test_loader):
-        return super().evaluate(test_loader)
+        with self._snapshot_cache():
+            return super().evaluate(test_loader)
 
     @torchensemble_model_doc(item="predict")
     def predict(self, *x):
@@ -1,6 +1,8 @@
+import torch
 import pytest
 import torchensemble
 import torch.nn as nn
+from torchensemble.utils import set_module
 
 
 optimizer_list = [
@@ -71,3 +73,44 @@ def test_update_lr_invalid():
     ).format(cur_lr)
     with pytest.raises(ValueError, match=err_msg):
         torchensemble.utils.set_module.update_lr(optimizer, cur_lr)
+
+
+@pytest.mark.parametrize(
+    "optimizer_name, kwargs, expected",
+    [
+        ("Adam", {}, {"fused": True}),
+        ("SGD", {"lr": 1e-3}, {"lr": 1e-3, "fused": True}),
+        ("Adagrad", {}, {"foreach": True}),
+        ("Adam", {"foreach": False}, {"foreach": False}),
+        ("Adam", {"differentiable": True}, {"differentiable": True}),
+    ],
+)
+def test_set_implementation(optimizer_name, kwargs, expected, monkeypatch):
+    monkeypatch.setattr(set_module, "_is_on_cuda", lambda params: True)
+    model = MLP()
+    optimizer_cls = getattr(torch.optim, optimizer_name)
+
+    actual = set_module._set_implementation(
+        model, optimizer_cls, list(model.parameters()), kwargs
+    )
+
+    assert actual == expected
+
+
+def test_set_implementation_default(monkeypatch):
+    model = MLP()
+    params = list(model.parameters())
+
+    # Parameters on CPU
+    actual = set_module._set_implementation(
+        model, torch.optim.Adam, params, {}
+    )
+    assert actual == {}
+
+    # Modules with sparse gradients
+    monkeypatch.setattr(set_module, "_is_on_cuda", lambda params: True)
+    model = nn.Sequential(nn.Embedding(4, 2, sparse=True), MLP())
+    actual = set_module._set_implementation(
+        model, torch.optim.SGD, list(model.parameters()), {}
+    )
+    assert actual == {}
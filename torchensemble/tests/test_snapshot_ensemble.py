@@ -0,0 +1,527 @@
+import math
+import torch
+import pytest
+import numpy as np
+import torch.nn as nn
+import torch.nn.functional as F
+from numpy.testing import assert_array_almost_equal
+from torch.utils.data import TensorDataset, DataLoader
+
+import torchensemble
+from torchensemble.utils import io
+from torchensemble.utils import operator as op
+
+
+np.random.seed(0)
+torch.manual_seed(0)
+
+
+# Base estimator
+class MLP(nn.Module):
+    def __init__(self):
+        super(MLP, self).__init__()
+        self.linear1 = nn.Linear(2, 4)
+        self.linear2 = nn.Linear(4, 3)
+
+    def forward(self, X):
+        X = X.view(X.size()[0], -1)
+        output = self.linear1(X)
+        output = self.linear2(output)
+        return output
+
+
+X_test = torch.Tensor(np.random.randn(8, 2))
+
+# Training data
+X_train = torch.Tensor(np.random.randn(8, 2))
+y_train = torch.LongTensor(np.random.randint(0, 3, 8))
+train_loader = DataLoader(TensorDataset(X_train, y_train), batch_size=2)
+
+
+def _make_model(method, n_estimators=3, **kwargs):
+    model = method(
+        estimator=MLP, n_estimators=n_estimators, cuda=False, **kwargs
+    )
+    model.n_outputs = 3
+    for _ in range(n_estimators):
+        model.estimators_.append(model._make_estimator())
+    model.eval()
+
+    return model
+
+
+@pytest.mark.parametrize("voting_strategy", ["soft", "hard"])
+def test_classifier_forward(voting_strategy):
+    model = _make_model(
+        torchensemble.SnapshotEnsembleClassifier,
+        voting_strategy=voting_strategy,
+    )
+
+    with torch.no_grad():
+        outputs = [
+            F.softmax(estimator(X_test), dim=1)
+            for estimator in model.estimators_
+        ]
+        if voting_strategy == "soft":
+            expected = op.average(outputs)
+        else:
+            expected = op.majority_vote(outputs)
+        actual = model(X_test)
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_regressor_forward():
+    model = _make_model(torchensemble.SnapshotEnsembleRegressor)
+
+    with torch.no_grad():
+        outputs = [estimator(X_test) for estimator in model.estimators_]
+        expected = op.average(outputs)
+        actual = model(X_test)
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+@pytest.mark.parametrize(
+    "lr, lr_clip, expected",
+    [(1.0, [0.1, 0.5], 0.5), (0.01, (0.1, 0.5), 0.1), (0.2, None, 0.2)],
+)
+def test_lr_clipper(lr, lr_clip, expected):
+    model = _make_model(torchensemble.SnapshotEnsembleClassifier)
+    optimizer = torch.optim.SGD(model.estimators_[0].parameters(), lr=lr)
+
+    clip_lr = model._set_lr_clipper(optimizer, lr_clip)
+    clip_lr()
+
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(expected)
+
+
+def test_set_scheduler():
+    model = _make_model(torchensemble.SnapshotEnsembleClassifier)
+    optimizer = torch.optim.SGD(model.estimators_[0].parameters(), lr=1.0)
+    n_iters = 10
+    T_M = math.ceil(n_iters / model.n_estimators)
+
+    scheduler = model._set_scheduler(optimizer, n_iters)
+    for iteration in range(n_iters):
+        expected = 0.5 * (math.cos(math.pi * (iteration % T_M) / T_M) + 1)
+        assert optimizer.param_groups[0]["lr"] == pytest.approx(expected)
+        optimizer.step()
+        scheduler.step()
+
+
+@pytest.mark.parametrize("voting_strategy", ["soft", "hard"])
+def test_classifier_vmap_forward(voting_strategy):
+    model = _make_model(
+        torchensemble.SnapshotEnsembleClassifier,
+        voting_strategy=voting_strategy,
+    )
+
+    with torch.no_grad():
+        with model._snapshot_cache():
+            actual = model(X_test)
+            assert model._stacked_state is not None
+        assert model._stacked_state is None
+
+        model._use_vmap = False
+        expected = model(X_test)
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_vmap_forward_cache():
+    model = _make_model(torchensemble.SnapshotEnsembleRegressor)
+
+    with torch.no_grad(), model._snapshot_cache():
+        model(X_test)
+        for param in model.estimators_[0].parameters():
+            param.add_(1.0)
+        actual = model(X_test)
+        expected = op.average(
+            [estimator(X_test) for estimator in model.estimators_]
+        )
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_fit_n_snapshots():
+    model = torchensemble.SnapshotEnsembleClassifier(
+        estimator=MLP, n_estimators=2, cuda=False
+    )
+    model.set_optimizer("SGD", lr=1e-1)
+    model.fit(train_loader, epochs=4, save_model=False)
+
+    assert len(model.estimators_) == 2
+
+
+def test_fit_without_amp(monkeypatch):
+    # Mixed precision APIs are missing in old versions of PyTorch, and they
+    # should not be used on CPU.
+    monkeypatch.delattr(torch, "autocast")
+    monkeypatch.delattr(torch.amp, "GradScaler")
+    monkeypatch.delattr(torch.cuda, "amp")
+
+    model = torchensemble.SnapshotEnsembleClassifier(
+        estimator=MLP, n_estimators=2, cuda=False
+    )
+    model.set_optimizer("SGD", lr=1e-1)
+    model.fit(train_loader, epochs=2, save_model=False)
+
+    assert len(model.estimators_) == 2
+
+
+def test_make_zero_grad():
+    estimator = MLP()
+    optimizer = torch.optim.SGD(estimator.parameters(), lr=1e-1)
+    estimator(X_test).sum().backward()
+
+    torchensemble.snapshot_ensemble._make_zero_grad(optimizer)()
+    assert all(param.grad is None for param in estimator.parameters())
+
+    # The optimizer in PyTorch < 1.7 has no `set_to_none`
+    class SGD(torch.optim.SGD):
+        def zero_grad(self):
+            super().zero_grad(set_to_none=False)
+
+    optimizer = SGD(estimator.parameters(), lr=1e-1)
+    estimator(X_test).sum().backward()
+
+    torchensemble.snapshot_ensemble._make_zero_grad(optimizer)()
+    for param in estimator.parameters():
+        assert_array_almost_equal(param.grad.numpy(), 0)
+
+
+def test_save_non_blocking(tmp_path):
+    model = _make_model(torchensemble.SnapshotEnsembleClassifier)
+    model.set_criterion(nn.CrossEntropyLoss())
+
+    future = io.save(model, str(tmp_path), model.logger, blocking=False)
+    future.result()
+
+    new_model = torchensemble.SnapshotEnsembleClassifier(
+        estimator=MLP, n_estimators=3, cuda=False
+    )
+    io.load(new_model, str(tmp_path))
+
+    assert len(new_model.estimators_) == len(model.estimators_)
+    for name, tensor in model.state_dict().items():
+        assert_array_almost_equal(
+            new_model.state_dict()[name].numpy(), tensor.numpy()
+        )
+
+
+class _ScalarRecorder(object):
+    def __init__(self):
+        self.scalars = []
+
+    def add_scalar(self, tag, value, global_step):
+        self.scalars.append((tag, value, global_step))
+
+
+def test_add_scalar():
+    model = _make_model(torchensemble.SnapshotEnsembleClassifier)
+    model.tb_logger = _ScalarRecorder()
+
+    for step in range(3):
+        model._add_scalar("loss", float(step), step, buffer_size=2)
+    assert model.tb_logger.scalars == [("loss", 0.0, 0), ("loss", 1.0, 1)]
+
+    model._flush_scalars()
+    assert model.tb_logger.scalars[-1] == ("loss", 2.0, 2)
+    assert model._tb_buffer == []
+
+
+def test_fit_interrupted_flush_scalars():
+    model = torchensemble.SnapshotEnsembleClassifier(
+        estimator=MLP, n_estimators=2, cuda=False
+    )
+    model.tb_logger = _ScalarRecorder()
+    model.set_optimizer("SGD", lr=1e-1)
+
+    # The training is interrupted in the second batch
+    n_calls = []
+
+    def criterion(output, target):
+        n_calls.append(None)
+        if len(n_calls) > 1:
+            raise KeyboardInterrupt
+        return F.cross_entropy(output, target)
+
+    model.set_criterion(criterion)
+
+    with pytest.raises(KeyboardInterrupt):
+        model.fit(train_loader, epochs=2, log_interval=1, save_model=False)
+
+    assert len(model.tb_logger.scalars) == 1
+    assert model._tb_buffer == []
+
+
+class _Future(object):
+    def __init__(self, error=None):
+        self.error = error
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+
+
+def test_fit_save_error(monkeypatch):
+    model = torchensemble.SnapshotEnsembleClassifier(
+        estimator=MLP, n_estimators=3, cuda=False
+    )
+    model.set_optimizer("SGD", lr=1e-1)
+
+    # The validation accuracy increases with each snapshot, and only the
+    # first serialization fails.
+    model._validate = lambda test_loader, *args: (
+        torch.tensor(len(model.estimators_)),
+        10,
+    )
+    futures = [_Future(OSError("No space left on device"))]
+    monkeypatch.setattr(
+        io,
+        "save",
+        lambda *args, **kwargs: futures.pop(0) if futures else _Future(),
+    )
+
+    with pytest.raises(OSError):
+        model.fit(train_loader, epochs=3, test_loader=train_loader)
+
+
+def test_validate_full_precision(monkeypatch):
+    model = _make_model(torchensemble.SnapshotEnsembleClassifier)
+
+    # The validation should not run under autocast, as `evaluate`
+    def autocast(enabled):
+        raise AssertionError("The validation runs under autocast.")
+
+    monkeypatch.setattr(torchensemble.snapshot_ensemble, "_autocast", autocast)
+    correct, total = model._validate(train_loader, channels_last=False)
+
+    assert total == len(train_loader.dataset)
+    assert (
+        correct.item()
+        == (model.predict(X_train).argmax(dim=1) == y_train).sum().item()
+    )
+
+
+class _Event(object):
+    def __init__(self):
+        self.n_syncs = 0
+
+    def synchronize(self):
+        self.n_syncs += 1
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        torchensemble.SnapshotEnsembleClassifier,
+        torchensemble.SnapshotEnsembleRegressor,
+    ],
+)
+def test_fit_deferred_validation(method, monkeypatch):
+    model = method(estimator=MLP, n_estimators=3, cuda=False)
+    model.set_optimizer("SGD", lr=1e-1)
+    if method is torchensemble.SnapshotEnsembleRegressor:
+        model.set_criterion(lambda output, target: output.float().mean())
+
+    # The validation improves with each snapshot, so that the ensemble is
+    # saved every time the validation is reported.
+    if method is torchensemble.SnapshotEnsembleClassifier:
+        model._validate = lambda test_loader, *args: (
+            torch.tensor(len(model.estimators_)),
+            10,
+        )
+    else:
+        model._validate = lambda test_loader, *args: (
+            torch.tensor(10.0 - len(model.estimators_)),
+            1,
+        )
+
+    # Reported as if the validation runs in background on GPU
+    events = []
+
+    def run_validation(validate, *args):
+        events.append(_Event())
+        return validate(*args), events[-1]
+
+    model._run_validation = run_validation
+
+    n_saved_estimators = []
+
+    def save(model, *args, **kwargs):
+        n_saved_estimators.append(len(model.estimators_))
+        return _Future()
+
+    monkeypatch.setattr(io, "save", save)
+
+    model.fit(train_loader, epochs=3, test_loader=train_loader)
+
+    # Each validation is reported before the next snapshot is generated
+    assert n_saved_estimators == [1, 2, 3]
+    assert [event.n_syncs for event in events] == [1, 1, 1]
+
+
+@pytest.mark.parametrize("voting_strategy", ["soft", "hard"])
+def test_classifier_predict_labels(voting_strategy):
+    model = _make_model(
+        torchensemble.SnapshotEnsembleClassifier,
+        voting_strategy=voting_strategy,
+    )
+
+    with torch.no_grad():
+        actual = model._predict_labels(X_test)
+        expected = model(X_test).argmax(dim=1)
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_host_outputs(monkeypatch):
+    model = _make_model(torchensemble.SnapshotEnsembleRegressor)
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_is_on_device",
+        lambda module, device: False,
+    )
+    model.estimators_[-1].train()
+
+    with torch.no_grad():
+        actual = op.average(list(model._host_outputs(X_test)))
+        expected = op.average(
+            [estimator(X_test) for estimator in model.estimators_]
+        )
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+    device_estimator = model._device_estimator[0]
+    assert all(
+        device_estimator is not estimator for estimator in model.estimators_
+    )
+    assert device_estimator.training
+    for actual, expected in zip(
+        device_estimator.parameters(), model.estimators_[-1].parameters()
+    ):
+        assert_array_almost_equal(
+            actual.detach().numpy(), expected.detach().numpy()
+        )
+
+
+def test_host_outputs_inference_mode(monkeypatch):
+    model = _make_model(torchensemble.SnapshotEnsembleRegressor)
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_is_on_device",
+        lambda module, device: False,
+    )
+
+    # The device estimator is first built under the inference mode, and
+    # then updated under `no_grad`.
+    with torch.inference_mode():
+        model(X_test)
+    with torch.no_grad():
+        actual = model(X_test)
+        expected = op.average(
+            [estimator(X_test) for estimator in model.estimators_]
+        )
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_snapshot_cache_device_snapshots(monkeypatch):
+    model = _make_model(torchensemble.SnapshotEnsembleRegressor)
+    model._use_vmap = False
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_is_on_device",
+        lambda module, device: False,
+    )
+
+    # Snapshots in host memory are copied to device once in the context
+    n_copies = []
+    copy_to_device = torchensemble.snapshot_ensemble._copy_to_device
+
+    def count_copy_to_device(module, device):
+        n_copies.append(None)
+        return copy_to_device(module, device)
+
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_copy_to_device",
+        count_copy_to_device,
+    )
+
+    with torch.no_grad():
+        expected = op.average(
+            [estimator(X_test) for estimator in model.estimators_]
+        )
+        with model._snapshot_cache():
+            for _ in range(3):
+                actual = model(X_test)
+                assert_array_almost_equal(actual.numpy(), expected.numpy())
+        assert model._device_snapshots is None
+
+    assert len(n_copies) == len(model.estimators_)
+
+
+def test_compile_fallback(monkeypatch):
+    dynamo = pytest.importorskip("torch._dynamo")
+
+    class _CompileError(dynamo.exc.TorchDynamoException):
+        pass
+
+    def fake_compile(estimator, **kwargs):
+        def compiled_estimator(*x):
+            raise _CompileError("Unsupported")
+
+        return compiled_estimator
+
+    monkeypatch.setattr(torch, "compile", fake_compile)
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_is_compile_supported",
+        lambda: True,
+    )
+    estimator = MLP()
+    device = torch.device("cuda")
+
+    assert (
+        torchensemble.snapshot_ensemble._compile(
+            estimator, device, enabled=False
+        )
+        is estimator
+    )
+
+    train_estimator = torchensemble.snapshot_ensemble._compile(
+        estimator, device
+    )
+    with torch.no_grad():
+        with pytest.warns(RuntimeWarning, match="fall back"):
+            actual = train_estimator(X_test)
+        expected = estimator(X_test)
+
+    assert_array_almost_equal(actual.numpy(), expected.numpy())
+
+
+def test_compile_runtime_error(monkeypatch):
+    pytest.importorskip("torch._dynamo")
+
+    # Errors unrelated to the compilation are not taken as compile errors
+    def fake_compile(estimator, **kwargs):
+        def compiled_estimator(*x):
+            raise RuntimeError("CUDA out of memory")
+
+        return compiled_estimator
+
+    monkeypatch.setattr(torch, "compile", fake_compile)
+    monkeypatch.setattr(
+        torchensemble.snapshot_ensemble,
+        "_is_compile_supported",
+        lambda: True,
+    )
+    train_estimator = torchensemble.snapshot_ensemble._compile(
+        MLP(), torch.device("cuda")
+    )
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        train_estimator(X_test)
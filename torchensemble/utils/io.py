@@ -1,9 +1,35 @@
 import os
 import torch
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 
-def save(model, save_dir, logger):
-    """Implement model serialization to the specified directory."""
+# A single worker keeps the writes to the same file in order.
+_writer = None
+
+
+def _get_writer():
+    """Return the background worker that writes serialized models."""
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1)
+
+    return _writer
+
+
+def _write_buffer(buffer, filename):
+    """Write the content of an in-memory buffer to the file."""
+    with open(filename, "wb") as f:
+        f.write(buffer.getbuffer())
+
+
+def save(model, save_dir, logger, blocking=True):
+    """
+    Implement model serialization to the specified directory. When
+    `blocking` is False, the model is serialized into an in-memory buffer,
+    and the buffer is written to the disk in a background thread. A future
+    on the write is returned in this case.
+    """
     if save_dir is None:
         save_dir = "./"
 
@@ -40,9 +66,14 @@ def save(model, save_dir, logger):
     logger.info("Saving the model to `{}`".format(save_dir))
 
     # Save
-    torch.save(state, save_dir)
+    if blocking:
+        torch.save(state, save_dir)
+        return
+
+    buffer = BytesIO()
+    torch.save(state, buffer)
 
-    return
+    return _get_writer().submit(_write_buffer, buffer, save_dir)
 
 
 def load(model, save_dir="./", logger=None):
@@ -91,15 +122,18 @@ def split_data_target(element, device, logger=None):
             logger.error(msg)
         raise ValueError(msg)
 
+    # The copy is asynchronous when the tensors are in pinned memory, e.g.,
+    # from a dataloader with `pin_memory=True`.
     if len(element) == 2:
         # Dataloader with one input and one target
         data, target = element[0], element[1]
-        return [data.to(device)], target.to(device)  # tensor -> list
+        data_device = [data.to(device, non_blocking=True)]  # tensor -> list
+        return data_device, target.to(device, non_blocking=True)
     elif len(element) > 2:
         # Dataloader with multiple inputs and one target
         data, target = element[:-1], element[-1]
-        data_device = [tensor.to(device) for tensor in data]
-        return data_device, target.to(device)
+        data_device = [tensor.to(device, non_blocking=True) for tensor in data]
+        return data_device, target.to(device, non_blocking=True)
     else:
         # Dataloader with invalid input
         msg = (
@@ -1,9 +1,13 @@
+import inspect
 import importlib
 
 
 def set_optimizer(model, optimizer_name, **kwargs):
     """
-    Set the parameter optimizer for the model.
+    Set the parameter optimizer for the model. When all parameters are on
+    GPU, the fused or multi-tensor (foreach) implementation of the optimizer
+    is used if available, unless specified otherwise in ``kwargs``, or if it
+    is incompatible with ``kwargs`` or the model.
 
     Reference: https://pytorch.org/docs/stable/optim.html#algorithms
     """
@@ -28,11 +32,55 @@ def set_optimizer(model, optimizer_name, **kwargs):
     optimizer_cls = getattr(
         importlib.import_module("torch.optim"), optimizer_name
     )
-    optimizer = optimizer_cls(model.parameters(), **kwargs)
+    params = list(model.parameters())
+    kwargs = _set_implementation(model, optimizer_cls, params, kwargs)
+
+    optimizer = optimizer_cls(params, **kwargs)
 
     return optimizer
 
 
+def _is_on_cuda(params):
+    """Check whether all parameters are on GPU."""
+    return bool(params) and all(param.is_cuda for param in params)
+
+
+def _set_implementation(model, optimizer_cls, params, kwargs):
+    """
+    Return the keyword arguments of the optimizer with the fused or
+    multi-tensor (foreach) implementation enabled if available, when all
+    parameters are on GPU. The implementation is left as default if it is
+    specified in ``kwargs``, or if it is incompatible with ``kwargs`` or
+    the model, e.g., the differentiable optimizer and sparse gradients.
+    """
+    if (
+        "fused" in kwargs
+        or "foreach" in kwargs
+        or kwargs.get("differentiable", False)
+        or not _is_on_cuda(params)
+    ):
+        return kwargs
+
+    # Modules with sparse gradients, e.g., `nn.Embedding(sparse=True)`
+    if any(getattr(module, "sparse", False) for module in model.modules()):
+        return kwargs
+
+    # Optimizers with the fused implementation on GPU
+    torch_fused_optimizers = ["Adam", "AdamW", "SGD"]
+
+    optimizer_params = inspect.signature(optimizer_cls).parameters
+    kwargs = dict(kwargs)
+    if (
+        optimizer_cls.__name__ in torch_fused_optimizers
+        and "fused" in optimizer_params
+    ):
+        kwargs["fused"] = True
+    elif "foreach" in optimizer_params:
+        kwargs["foreach"] = True
+
+    return kwargs
+
+
 def update_lr(optimizer, lr):
     """
     Manually update the learning rate of the optimizer. This function is used